@@ -18,27 +18,54 @@ Notes:
 from __future__ import annotations
 
 import argparse
+import copy
 import json
 import shutil
 import subprocess
 import os
+import tempfile
+import random
 import time
-import requests
 from pathlib import Path
 import sys
 
-# Ensure the FusionAutomationAPICreationToolkit folder is importable so we can reuse its token helper
-_toolkit_dir = Path(__file__).resolve().parent / 'FusionAutomationAPICreationToolkit'
-# Try to make the toolkit folder importable and import the token helper.
-# If that fails (different CWD or packaging), fall back to loading the file by path.
 try:
-    if str(_toolkit_dir) not in sys.path:
-        sys.path.insert(0, str(_toolkit_dir))
-    from GenerateAccessToken import GenerateNewAccessToken  # type: ignore
-except Exception:
-    # Fallback: load module by file location
-    gen_file = _toolkit_dir / 'GenerateAccessToken.py'
-    if gen_file.exists():
+    import orjson  # optional: much faster JSON load/dump
+except ImportError:
+    orjson = None
+
+# Resolve this script's location once; Path.resolve() walks the filesystem on every call
+_HERE = Path(__file__).resolve().parent
+_PARENT = _HERE.parent
+# Candidate locations of the main JSON (the second covers a layout one level deeper)
+_CFG_A = _HERE / '2F_Param_Sample_Main' / '2F_Param_Sample.json'
+_CFG_B = _PARENT / '2F_Param_Sample_Main' / '2F_Param_Sample.json'
+
+# Ensure the FusionAutomationAPICreationToolkit folder is importable so we can reuse its token helper
+# and shared HTTP client
+_toolkit_dir = _HERE / 'FusionAutomationAPICreationToolkit'
+_gen_mod = None
+
+
+def _toolkit():
+    """Import the toolkit's GenerateAccessToken module on first use.
+
+    Deferred so that --no-run invocations never pay for importing requests.
+    """
+    global _gen_mod
+    if _gen_mod is not None:
+        return _gen_mod
+    # Try to make the toolkit folder importable and import the token helper.
+    # If that fails (different CWD or packaging), fall back to loading the file by path.
+    try:
+        if str(_toolkit_dir) not in sys.path:
+            sys.path.insert(0, str(_toolkit_dir))
+        import GenerateAccessToken as gen_mod  # type: ignore
+    except Exception:
+        # Fallback: load module by file location
+        gen_file = _toolkit_dir / 'GenerateAccessToken.py'
+        if not gen_file.exists():
+            raise ImportError(f'Could not import GenerateAccessToken. Checked sys.path and {gen_file}')
         import importlib.util
 
         spec = importlib.util.spec_from_file_location('GenerateAccessToken', str(gen_file))
@@ -46,9 +73,8 @@ except Exception:
             raise ImportError(f'Could not load spec for GenerateAccessToken from {gen_file}')
         gen_mod = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(gen_mod)  # type: ignore
-        GenerateNewAccessToken = getattr(gen_mod, 'GenerateNewAccessToken')
-    else:
-        raise ImportError(f'Could not import GenerateAccessToken. Checked sys.path and {gen_file}')
+    _gen_mod = gen_mod
+    return _gen_mod
 
 # Default value set inside the script. Change this constant to update the value used
 # when no --value CLI argument is provided.
@@ -72,14 +98,53 @@ DEFAULT_UPDATES = {
 }
 
 def load_json(path: Path) -> dict:
-    with path.open("r", encoding="utf-8") as f:
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with path.open("r", encoding="utf-8", buffering=65536) as f:
         return json.load(f)
 
 
-def write_json(path: Path, data: dict) -> None:
+def write_json(path: Path, data: dict, backup: Path | None = None, durable: bool = False) -> None:
+    """Write data to path atomically via a temp file in the same folder and os.replace.
+
+    Readers never see a half-written or missing file. If backup is given, the existing file is
+    hard-linked (or copied, where links aren't supported) there first, so the live path is only
+    ever touched by the single replace. durable=True fsyncs before the replace.
+    """
     # preserve pretty formatting
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, indent=2).encode("utf-8")
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        # mkstemp creates the file 0600; keep the original's mode (or the usual umask default)
+        try:
+            shutil.copymode(path, tmp)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp, 0o666 & ~umask)
+        if backup is not None and path.exists():
+            try:
+                os.remove(backup)
+            except FileNotFoundError:
+                pass
+            try:
+                os.link(path, backup)
+            except OSError:
+                shutil.copy2(path, backup)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
 
 
 def update_parameter(json_path: Path, param_name: str, value: str, backup: bool = True) -> Path:
@@ -103,22 +168,22 @@ def update_parameter(json_path: Path, param_name: str, value: str, backup: bool
     return json_path
 
 
-def apply_updates(json_path: Path, parameter_updates: dict, other_updates: dict | None = None, backup: bool = True) -> Path:
+def apply_updates(json_path: Path, parameter_updates: dict, other_updates: dict | None = None, backup: bool = True, durable: bool = False) -> tuple[Path, dict, bool]:
     """Apply updates to the target JSON.
 
     - parameter_updates: dict of name->value to set inside the `parameters` element.
       The function will clear any existing parameters and only include the provided ones.
     - other_updates: dict of other top-level keys to set/overwrite.
+    - durable: fsync the new file before it replaces the old one.
+
+    Returns the path, the updated data (so callers can use it without re-reading the file) and
+    whether anything was written.
     """
     if not json_path.exists():
         raise FileNotFoundError(f"JSON file not found: {json_path}")
 
     data = load_json(json_path)
-
-    # Backup
-    if backup:
-        bak = json_path.with_suffix(json_path.suffix + ".bak")
-        shutil.copy2(json_path, bak)
+    original = dict(data)
 
     # Replace parameters entirely
     data['parameters'] = {}
@@ -133,8 +198,17 @@ def apply_updates(json_path: Path, parameter_updates: dict, other_updates: dict
                 continue
             data[k] = v
 
-    write_json(json_path, data)
-    return json_path
+    # Re-running with the same values is common; skip the backup and write entirely
+    if data == original:
+        return json_path, data, False
+
+    # Backup: the original is hard-linked to .bak just before the new file is swapped in
+    bak = json_path.with_suffix(json_path.suffix + ".bak") if backup else None
+    write_json(json_path, data, backup=bak, durable=durable)
+    return json_path, data, True
+
+
+_config_cache: dict[Path, tuple[int, int, dict]] = {}
 
 
 def _load_task_parameters_from_main() -> dict:
@@ -142,14 +216,24 @@ def _load_task_parameters_from_main() -> dict:
 
     Returns parsed JSON dict or a sensible fallback on error.
     """
-    config_path = Path(__file__).resolve().parent / '2F_Param_Sample_Main' / '2F_Param_Sample.json'
-    # In case file layout is one level deeper, check parent.parent as fallback
-    if not config_path.exists():
-        config_path = Path(__file__).resolve().parent.parent / '2F_Param_Sample_Main' / '2F_Param_Sample.json'
-
     try:
-        with config_path.open('r', encoding='utf-8') as fh:
-            return json.load(fh)
+        # In case file layout is one level deeper, check parent.parent as fallback.
+        # The stat doubles as the existence check, so the happy path costs one syscall.
+        for config_path in (_CFG_A, _CFG_B):
+            try:
+                st = config_path.stat()
+                break
+            except FileNotFoundError:
+                continue
+        else:
+            raise FileNotFoundError(f'file not found (also checked {_CFG_A})')
+        # Reuse the parsed dict while the file is unchanged (e.g. parameter sweeps in one process)
+        key = (st.st_mtime_ns, st.st_size)
+        cached = _config_cache.get(config_path)
+        if cached is None or cached[:2] != key:
+            cached = (*key, load_json(config_path))
+            _config_cache[config_path] = cached
+        return copy.deepcopy(cached[2])
     except Exception as e:
         print(f'Warning: could not load task parameters from {config_path}: {e}')
         # Fall back to DEFAULT_UPDATES where possible so there are no hardcoded
@@ -160,18 +244,59 @@ def _load_task_parameters_from_main() -> dict:
         }
 
 
-def run_typescript(folder: Path, ts_file: str) -> int:
+def _poll_workitem_status(client, poll_url: str, headers: dict | None = None):
+    """Yield the parsed workitem status body each time the server returns a fresh one.
+
+    headers (e.g. the bearer headers) are sent on every GET.
+
+    The wait between polls backs off exponentially (0.5s -> ~10s) with a little jitter and
+    honours Retry-After / 429. The endpoint has no long-poll mode, so this is plain polling:
+    once an ETag is known it is sent as If-None-Match so unchanged bodies come back as an
+    empty 304. The 60s timeout only bounds a slow response.
+    """
+    delay = 0.5
+    etag = None
+    while True:
+        wait = None
+        try:
+            st = client.get(poll_url, headers={**(headers or {}), 'If-None-Match': etag} if etag else headers, timeout=60)
+            if st.status_code == 429:
+                delay = max(delay, 10.0)
+            retry_after = st.headers.get('Retry-After')
+            if retry_after:
+                try:
+                    wait = float(retry_after)
+                except ValueError:
+                    pass
+            if st.status_code != 304:
+                st.raise_for_status()
+                etag = st.headers.get('ETag') or etag
+                yield st.json()
+        except Exception as e:
+            print('Error checking workitem status:', e)
+        # Wait a bit before polling again, honouring Retry-After when the server sends one
+        if wait is None:
+            wait = delay + random.uniform(0, delay * 0.1)
+        time.sleep(wait)
+        delay = min(delay * 1.7, 10.0)
+
+
+def run_typescript(folder: Path, ts_file: str, task_params_obj: dict | None = None) -> int:
     """Instead of running TypeScript locally, create a Design Automation workitem and poll for completion.
 
+    If task_params_obj is given it is used directly, otherwise the task parameters are loaded from the main JSON.
     Returns 0 on success, non-zero on failure.
     """
     # Load task parameters from main JSON (this file should have been updated earlier)
-    task_params_obj = _load_task_parameters_from_main()
-    task_params_str = json.dumps(task_params_obj)
+    if task_params_obj is None:
+        task_params_obj = _load_task_parameters_from_main()
+    toolkit = _toolkit()
+    task_params_str = toolkit.json_dumps(task_params_obj)
 
-    # Use access token for API calls
-    access_token = GenerateNewAccessToken()
-    headers = {'Authorization': f'Bearer {access_token}', 'Content-Type': 'application/json'}
+    # Use access token for API calls. The headers go on each request rather than on the
+    # client, which is shared toolkit-wide (including the S3 upload when httpx isn't installed)
+    client = toolkit.client
+    headers = toolkit.bearer_headers()
 
     payload = {
         "activityId": "<YOUR_NICKNAME_HERE>.<YOUR_ACTIVITY_NAME_HERE>+my_current_version",
@@ -183,7 +308,7 @@ def run_typescript(folder: Path, ts_file: str) -> int:
     }
 
     try:
-        resp = requests.post('https://developer.api.autodesk.com/da/us-east/v3/workitems', json=payload, headers=headers)
+        resp = client.post('https://developer.api.autodesk.com/da/us-east/v3/workitems', json=payload, headers=headers)
     except Exception as e:
         print('Failed to submit workitem:', e)
         return 3
@@ -204,49 +329,53 @@ def run_typescript(folder: Path, ts_file: str) -> int:
 
     # Poll workitem status until success or terminal failure
     status = None
+    last_status = None
     poll_url = f'https://developer.api.autodesk.com/da/us-east/v3/workitems/{workitem_id}'
     print('Polling workitem:', workitem_id)
-    while True:
-        try:
-            st = requests.get(poll_url, headers=headers)
-            st.raise_for_status()
-            st_json = st.json()
-            status = st_json.get('status')
+    for st_json in _poll_workitem_status(client, poll_url, headers):
+        status = st_json.get('status')
+        # Only report transitions; long jobs otherwise print the same line hundreds of times
+        if status != last_status:
             print('Workitem status:', status)
-            if status == 'success':
-                print('Workitem completed successfully')
-                return 0
-            if status in ('failed', 'error'):
-                print('Workitem finished with error state:', status)
-                print('Full status response:', st_json)
-                return 6
-        except Exception as e:
-            print('Error checking workitem status:', e)
-        # Wait a bit before polling again
-        time.sleep(3)
+            last_status = status
+        if status == 'success':
+            print('Workitem completed successfully')
+            return 0
+        if status in ('failed', 'error'):
+            print('Workitem finished with error state:', status)
+            print('Full status response:', st_json)
+            return 6
 
 
-def main(argv: list[str] | None = None) -> int:
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Update parameters in the JSON and run the TS/workitem flow")
-    parser.add_argument("--file", default=None, help="Path to JSON file to edit (defaults to 2F_Param_Sample_Main/2F_Param_Sample.json)")
+    parser.add_argument("--file", default=None, help="Path to JSON file to edit (defaults to 2F_Param_Sample_Main/2F_Param_Sample.json). The workitem always submits the main 2F_Param_Sample_Main JSON")
     parser.add_argument("--param", "-p", dest="params", action='append', help="Parameter update in the form NAME=VALUE. Can be passed multiple times.")
     parser.add_argument("--set", "-s", dest="sets", action='append', help="Top-level JSON update in the form KEY=VALUE (e.g. fileURN=urn:...). Can be passed multiple times.")
     parser.add_argument("--no-run", action="store_true", help="Only update JSON; do not run the TS file")
+    parser.add_argument("--no-backup", action="store_true", help="Do not keep the previous JSON as a .bak file")
+    parser.add_argument("--durable", action="store_true", help="fsync the updated JSON to disk before replacing the old file")
     parser.add_argument("--ts-file", default="2F_Param_Sample.ts", help="TypeScript script to run (in same folder)")
-    args = parser.parse_args(argv)
+    return parser
 
+
+# Built once and reused by every main() call
+_PARSER = _build_parser()
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _PARSER.parse_args(argv)
+
+    # The workitem is always built from the main config (see _load_task_parameters_from_main)
+    main_cfg = _CFG_A if _CFG_A.exists() else _CFG_B
     if args.file:
         json_path = Path(args.file)
         # If a relative path was given, assume it's relative to this script's directory
         if not json_path.is_absolute():
-            base = Path(__file__).resolve().parent
-            json_path = (base / json_path).resolve()
+            json_path = (_HERE / json_path).resolve()
     else:
         # Default: write into the 2F_Param_Sample_Main folder so CreateWorkItem reads it
-        default_main = Path(__file__).resolve().parent / '2F_Param_Sample_Main' / '2F_Param_Sample.json'
-        if not default_main.exists():
-            default_main = Path(__file__).resolve().parent.parent / '2F_Param_Sample_Main' / '2F_Param_Sample.json'
-        json_path = default_main
+        json_path = main_cfg
 
     # Build parameter updates and other updates from CLI and defaults
     param_updates: dict = {}
@@ -281,8 +410,11 @@ def main(argv: list[str] | None = None) -> int:
                 other_updates[k] = v
 
     try:
-        updated = apply_updates(json_path, parameter_updates=param_updates, other_updates=other_updates)
-        print(f"Updated {updated} -> parameters = {param_updates}, other = {other_updates}")
+        updated, updated_data, changed = apply_updates(json_path, parameter_updates=param_updates, other_updates=other_updates, backup=not args.no_backup, durable=args.durable)
+        if changed:
+            print(f"Updated {updated} -> parameters = {param_updates}, other = {other_updates}")
+        else:
+            print(f"No changes for {updated}; leaving file untouched")
     except Exception as e:
         print(f"Failed to update JSON: {e}")
         return 2
@@ -295,8 +427,12 @@ def main(argv: list[str] | None = None) -> int:
     ts_folder = json_path.parent
     ts_file = args.ts_file
 
+    # Reuse the data just written only when it is the main config; otherwise let
+    # run_typescript load the main config as it always has
+    task_params_obj = updated_data if json_path == main_cfg or json_path.resolve() == main_cfg else None
+
     try:
-        rc = run_typescript(ts_folder, ts_file)
+        rc = run_typescript(ts_folder, ts_file, task_params_obj=task_params_obj)
         print(f"TypeScript process exited with code {rc}")
         return rc
     except Exception as e:
@@ -1,20 +1,26 @@
-import requests
-import json
+from GenerateAccessToken import bearer_headers, client as shared_client
 
-from GenerateAccessToken import GenerateNewAccessToken
 
-accesstokenCurrent = GenerateNewAccessToken()
-#print(accesstokenCurrent)
+def check_workitem_status(workitem_id: str, access_token: str | None = None, session=None):
+    """Fetch the status of a workitem and return the response object.
 
-headerslist = {
-        'Authorization': f'Bearer {accesstokenCurrent}',
-        'Content-Type': 'application/json'
-}
+    Pass a session/access_token to reuse ones you already have; by default the toolkit's
+    shared client and cached token are used.
+    """
+    session = session or shared_client
+    return session.get(f'https://developer.api.autodesk.com/da/us-east/v3/workitems/{workitem_id}', headers=bearer_headers(access_token))
 
-response = requests.get('https://developer.api.autodesk.com/da/us-east/v3/workitems/<PASTE_WORK_ITEM_CODE_HERE>', headers=headerslist)
 
-print(response.status_code)
-try:
-    print(response.json())
-except ValueError:
-    print('No JSON returned. Response text:', response.text)
\ No newline at end of file
+def main() -> int:
+    response = check_workitem_status('<PASTE_WORK_ITEM_CODE_HERE>')
+
+    print(response.status_code)
+    try:
+        print(response.json())
+    except ValueError:
+        print('No JSON returned. Response text:', response.text)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
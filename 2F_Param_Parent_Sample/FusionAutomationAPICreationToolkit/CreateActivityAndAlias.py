@@ -1,41 +1,41 @@
 import argparse
 import json
-import requests
 import sys
 from typing import List, Optional
 
-from GenerateAccessToken import GenerateNewAccessToken
+from GenerateAccessToken import bearer_headers, post_json
 
+# Fields every activity payload carries; create_activity only fills in the variable ones
+_ACTIVITY_TEMPLATE = {
+    "commandline": [],
+    "parameters": {},
+    "appbundles": [],
+    "settings": {},
+    "description": ""
+}
 
-def create_activity(activity_id: str, engine: str, appbundles: List[str], parameters: Optional[dict] = None, settings: Optional[dict] = None, description: str = "") -> requests.Response:
+
+def create_activity(activity_id: str, engine: str, appbundles: List[str], parameters: Optional[dict] = None, settings: Optional[dict] = None, description: str = ""):
     """Create an activity on the Autodesk DA endpoint and return the response object."""
-    token = GenerateNewAccessToken()
-    headers = {
-        'Authorization': f'Bearer {token}',
-        'Content-Type': 'application/json'
-    }
+    headers = bearer_headers()
 
     payload = {
+        **_ACTIVITY_TEMPLATE,
         "id": activity_id,
         "engine": engine,
-        "commandline": [],
         "parameters": parameters or {},
         "appbundles": appbundles,
         "settings": settings or {},
         "description": description
     }
 
-    resp = requests.post('https://developer.api.autodesk.com/da/us-east/v3/activities', json=payload, headers=headers)
+    resp = post_json('https://developer.api.autodesk.com/da/us-east/v3/activities', payload, headers)
     return resp
 
 
-def create_activity_alias(activity_id: str, alias_id: str = 'my_current_version', version: str = '1') -> requests.Response:
+def create_activity_alias(activity_id: str, alias_id: str = 'my_current_version', version: str = '1'):
     """Create an alias for an existing activity and return the response object."""
-    token = GenerateNewAccessToken()
-    headers = {
-        'Authorization': f'Bearer {token}',
-        'Content-Type': 'application/json'
-    }
+    headers = bearer_headers()
 
     payload = {
         "version": int(version),
@@ -43,7 +43,7 @@ def create_activity_alias(activity_id: str, alias_id: str = 'my_current_version'
     }
 
     url = f'https://developer.api.autodesk.com/da/us-east/v3/activities/{activity_id}/aliases'
-    resp = requests.post(url, json=payload, headers=headers)
+    resp = post_json(url, payload, headers)
     return resp
 
 
@@ -1,8 +1,7 @@
-import requests
 import json
 from pathlib import Path
 
-from GenerateAccessToken import GenerateNewAccessToken
+from GenerateAccessToken import bearer_headers, json_dumps, client as shared_client
 
 
 def load_task_parameters() -> dict:
@@ -28,31 +27,38 @@ def load_task_parameters() -> dict:
             }
         }
 
-accesstokenCurrent = GenerateNewAccessToken()
+def create_workitem(task_params: dict | str, access_token: str | None = None, session=None):
+    """Submit a workitem for the activity with the given task parameters and return the response object.
 
-headerslist = {
-    'Authorization': f'Bearer {accesstokenCurrent}',
-    'Content-Type': 'application/json'
-}
+    task_params may be the parameters dict or its already-encoded JSON string.
+    session may be a requests.Session or an httpx.Client; the toolkit's shared client is the default.
+    """
+    session = session or shared_client
 
-# Load task parameters (dict) and convert to a JSON string for the TaskParameters argument
-task_params_obj = load_task_parameters()
-task_params_str = json.dumps(task_params_obj)
+    payload = {
+        "activityId": "<YOUR_NICKNAME_HERE>.<YOUR_ACTIVITY_NAME_HERE>+my_current_version",
+        "arguments": {
+            "PersonalAccessToken": "<YOUR_PERSONAL_ACCESS_TOKEN_HERE>",
+            "TaskParameters": task_params if isinstance(task_params, str) else json_dumps(task_params)
+        }
+    }
 
-print(f'{task_params_str}')
+    return session.post('https://developer.api.autodesk.com/da/us-east/v3/workitems', json=payload, headers=bearer_headers(access_token))
 
-payload = {
-    "activityId": "<YOUR_NICKNAME_HERE>.<YOUR_ACTIVITY_NAME_HERE>+my_current_version",
-    "arguments": {
-        "PersonalAccessToken": "<YOUR_PERSONAL_ACCESS_TOKEN_HERE>",
-        "TaskParameters": task_params_str
-    }
-}
 
-response = requests.post('https://developer.api.autodesk.com/da/us-east/v3/workitems', json=payload, headers=headerslist)
+def main() -> int:
+    # Encode once: the same string is printed and submitted
+    task_params = json_dumps(load_task_parameters())
+    print(task_params)
+    response = create_workitem(task_params)
+
+    print(response.status_code)
+    try:
+        print(response.json())
+    except ValueError:
+        print('No JSON returned. Response text:', response.text)
+    return 0
+
 
-print(response.status_code)
-try:
-    print(response.json())
-except ValueError:
-    print('No JSON returned. Response text:', response.text)
\ No newline at end of file
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,28 +1,148 @@
 import base64
+import json
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # optional: faster JSON encoding/decoding of request and response bodies
+except ImportError:
+    orjson = None
 
 clientID = '<YOUR_CLIENT_ID_HERE>'
 clientSecret = '<YOUR_CLIENT_SECRET_HERE>'
 
-def GenerateNewAccessToken():
+# Shared session so every call to developer.api.autodesk.com reuses pooled keep-alive
+# connections instead of doing a fresh TCP+TLS handshake per request.
+# Only idempotent methods (urllib3 default) are retried on 429/5xx; a POST such as a workitem
+# submit could be run twice. Callers that know a POST is safe to resend opt in via post_json.
+_RETRY_ATTEMPTS = 3
+_RETRY_BACKOFF = 0.3
+_RETRY_STATUS = frozenset([429, 500, 502, 503, 504])
+# Rate-limited / unavailable: what post_json(resend=True) retries on
+_RESEND_STATUS = frozenset([429, 503])
+
+
+def _retry_wait(response, attempt):
+    """Seconds to wait before resending: Retry-After if given, else exponential backoff."""
+    try:
+        return float(response.headers.get('Retry-After', ''))
+    except ValueError:
+        return _RETRY_BACKOFF * 2 ** attempt
+
+
+# raise_on_status=False: once retries run out the final response is returned, as with httpx below
+session = requests.Session()
+session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                      max_retries=Retry(total=_RETRY_ATTEMPTS, backoff_factor=_RETRY_BACKOFF, status_forcelist=_RETRY_STATUS, raise_on_status=False)))
+
+# Process-wide client for developer.api.autodesk.com: with httpx[http2] installed the token
+# fetch, submits and status polls all multiplex over one HTTP/2 connection. Without it this
+# is simply the shared requests session above (same call signatures for get/post/patch/delete).
+try:
+    import httpx
+
+    class _RetryTransport(httpx.HTTPTransport):
+        """httpx has no status-based retries, so mirror the session's Retry policy here:
+        the same idempotent methods are resent on 429/5xx with the same backoff (or Retry-After)."""
+
+        def handle_request(self, request):
+            if request.method not in Retry.DEFAULT_ALLOWED_METHODS:
+                return super().handle_request(request)
+            for attempt in range(_RETRY_ATTEMPTS + 1):
+                response = super().handle_request(request)
+                if attempt == _RETRY_ATTEMPTS or response.status_code not in _RETRY_STATUS:
+                    break
+                wait = _retry_wait(response, attempt)
+                response.close()
+                time.sleep(wait)
+            return response
+
+    client = httpx.Client(transport=_RetryTransport(http2=True, retries=_RETRY_ATTEMPTS, limits=httpx.Limits(max_keepalive_connections=4)),
+                          timeout=httpx.Timeout(10.0, read=60.0))
+except ImportError:  # httpx or h2 not installed
+    client = session
 
-    encodedClientDetails = base64.b64encode(f'{clientID}:{clientSecret}'.encode()).decode()
-    #print(encodedClientDetails)
+# clientID/clientSecret are constants, so the Basic auth header and form body are built once
+_BASIC = 'Basic ' + base64.b64encode(f'{clientID}:{clientSecret}'.encode()).decode()
+_AUTH_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded',
+        'Accept': 'application/json',
+        'Authorization': _BASIC
+}
+_TOKEN_PAYLOAD = {
+    'grant_type': 'client_credentials',
+    'scope': 'code:all bucket:create bucket:read data:create data:write data:read'
+}
 
-    headerslist = {'Content-Type': 'application/x-www-form-urlencoded', 
-            'Accept': 'application/json', 
-            'Authorization': f'Basic {encodedClientDetails}'
-    }
-    payload = {
-        'grant_type': 'client_credentials', 
-        'scope': 'code:all bucket:create bucket:read data:create data:write data:read'
-    }
+# Token reuse: tokens are valid for `expires_in` seconds, refresh a minute early
+_cached_token = None
+_token_expiry = 0.0
+_bearer_headers = {}
 
-    response = requests.post('https://developer.api.autodesk.com/authentication/v2/token', data=payload, headers=headerslist)
+def GenerateNewAccessToken():
+    global _cached_token, _token_expiry
+
+    if _cached_token and time.monotonic() < _token_expiry:
+        return _cached_token
+
+    response = client.post('https://developer.api.autodesk.com/authentication/v2/token', data=_TOKEN_PAYLOAD, headers=_AUTH_HEADERS)
     jsonResponse = response.json()
     key = jsonResponse.get('access_token')
+    if key:
+        _cached_token = key
+        _token_expiry = time.monotonic() + float(jsonResponse.get('expires_in', 0)) - 60
     return key
     #print(key)
     #print(response.json())
 
-GenerateNewAccessToken()
\ No newline at end of file
+def bearer_headers(access_token=None):
+    """Return the Bearer + JSON headers for access_token (default: the cached token).
+
+    The dict is built once per token and shared, so treat it as read-only.
+    """
+    global _bearer_headers
+    if access_token is None:
+        access_token = GenerateNewAccessToken()
+    if _bearer_headers.get('Authorization') != f'Bearer {access_token}':
+        _bearer_headers = {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+    return _bearer_headers
+
+def invalidate_token():
+    """Drop the cached token so the next call fetches a fresh one (e.g. after a 401)."""
+    global _cached_token, _token_expiry, _bearer_headers
+    _cached_token = None
+    _token_expiry = 0.0
+    _bearer_headers = {}
+
+def json_dumps(obj) -> str:
+    """Compact JSON string for obj, e.g. the TaskParameters workitem argument."""
+    return orjson.dumps(obj).decode() if orjson is not None else json.dumps(obj)
+
+def json_loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def post_json(url, payload, headers, http=client, resend=False):
+    """POST payload as a JSON body serialised once (headers carry the Content-Type).
+
+    http may be a requests.Session or an httpx.Client; the shared client is the default.
+    With resend=True the POST is sent again on 429/503 (Retry-After or backoff between
+    attempts); only use it for calls that are safe to repeat, e.g. register/alias by id.
+    """
+    body = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode()
+    # requests takes raw bytes as data=, httpx as content=
+    body_kwarg = 'data' if isinstance(http, requests.Session) else 'content'
+    for attempt in range(_RETRY_ATTEMPTS + 1):
+        resp = http.post(url, headers=headers, **{body_kwarg: body})
+        if not resend or attempt == _RETRY_ATTEMPTS or resp.status_code not in _RESEND_STATUS:
+            break
+        wait = _retry_wait(resp, attempt)
+        resp.close()
+        time.sleep(wait)
+    return resp
+
+if __name__ == '__main__':
+    print(GenerateNewAccessToken())
@@ -1,36 +1,58 @@
-import requests
-
-from GenerateAccessToken import GenerateNewAccessToken
-
-accesstokenCurrent = GenerateNewAccessToken()
-#print(accesstokenCurrent)
-
-headerslist = {
-        'Authorization': f'Bearer {accesstokenCurrent}',
-        'Content-Type': 'application/json'
-}
-
-response = {}
-response2 = {}
-
-appbundlelist = requests.get('https://developer.api.autodesk.com/da/us-east/v3/appbundles', headers=headerslist)
-print(appbundlelist.json())
-response = requests.delete('https://developer.api.autodesk.com/da/us-east/v3/appbundles/<YOUR_APPBUNDLE_NAME_HERE>', headers=headerslist)
-print(response.status_code)
-
-activitylist = requests.get('https://developer.api.autodesk.com/da/us-east/v3/activities', headers=headerslist)
-print(activitylist.json())
-response2 = requests.delete('https://developer.api.autodesk.com/da/us-east/v3/activities/<YOUR_ACTIVITY_NAME_HERE>', headers=headerslist)
-print(response2.status_code)
-
-if response != {}:
-    try:
-        print(response.json())  
-    except ValueError:
-        print('No JSON returned. Response text:', response.text)
-
-if response2 != {}:
-    try:
-        print(response2.json())
-    except ValueError:
-        print('No JSON returned. Response text:', response2.text)
+from concurrent.futures import ThreadPoolExecutor
+
+from GenerateAccessToken import GenerateNewAccessToken, bearer_headers, client as shared_client
+
+
+def list_appbundles(access_token: str | None = None, session=None):
+    """List the appbundles owned by this app and return the response object."""
+    return (session or shared_client).get('https://developer.api.autodesk.com/da/us-east/v3/appbundles', headers=bearer_headers(access_token))
+
+
+def delete_appbundle(bundle_id: str, access_token: str | None = None, session=None):
+    """Delete an appbundle (and all its versions/aliases) and return the response object."""
+    return (session or shared_client).delete(f'https://developer.api.autodesk.com/da/us-east/v3/appbundles/{bundle_id}', headers=bearer_headers(access_token))
+
+
+def list_activities(access_token: str | None = None, session=None):
+    """List the activities owned by this app and return the response object."""
+    return (session or shared_client).get('https://developer.api.autodesk.com/da/us-east/v3/activities', headers=bearer_headers(access_token))
+
+
+def delete_activity(activity_id: str, access_token: str | None = None, session=None):
+    """Delete an activity (and all its versions/aliases) and return the response object."""
+    return (session or shared_client).delete(f'https://developer.api.autodesk.com/da/us-east/v3/activities/{activity_id}', headers=bearer_headers(access_token))
+
+
+def _list_then_delete(list_fn, delete_fn, item_id, access_token):
+    listing = list_fn(access_token)
+    return listing, delete_fn(item_id, access_token)
+
+
+def main() -> int:
+    accesstokenCurrent = GenerateNewAccessToken()
+    #print(accesstokenCurrent)
+
+    # Each list must come back before its delete so it shows the state before the delete;
+    # the appbundle and activity pairs are independent, so those two run concurrently
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        appbundles = ex.submit(_list_then_delete, list_appbundles, delete_appbundle, '<YOUR_APPBUNDLE_NAME_HERE>', accesstokenCurrent)
+        activities = ex.submit(_list_then_delete, list_activities, delete_activity, '<YOUR_ACTIVITY_NAME_HERE>', accesstokenCurrent)
+    appbundlelist, response = appbundles.result()
+    activitylist, response2 = activities.result()
+
+    print(appbundlelist.json())
+    print(response.status_code)
+
+    print(activitylist.json())
+    print(response2.status_code)
+
+    for resp in (response, response2):
+        try:
+            print(resp.json())
+        except ValueError:
+            print('No JSON returned. Response text:', resp.text)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
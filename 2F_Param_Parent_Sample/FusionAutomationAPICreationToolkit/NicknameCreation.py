@@ -1,23 +1,27 @@
-import requests
-import json
+from GenerateAccessToken import bearer_headers, client as shared_client
 
-from GenerateAccessToken import GenerateNewAccessToken
 
-accesstokenCurrent = GenerateNewAccessToken()
-#print(accesstokenCurrent)
+def create_nickname(nickname: str, access_token: str | None = None, session=None):
+    """Set the nickname for this app and return the response object."""
+    session = session or shared_client
 
-headerslist = {
-            'Authorization': f'Bearer {accesstokenCurrent}',
-            'Content-Type': 'application/json'
-}
-payload = {
-    "nickname": "<YOUR_NICKNAME_HERE>"
-}
+    payload = {
+        "nickname": nickname
+    }
 
-response = requests.patch('https://developer.api.autodesk.com/da/us-east/v3/forgeapps/me', json=payload, headers=headerslist)
+    return session.patch('https://developer.api.autodesk.com/da/us-east/v3/forgeapps/me', json=payload, headers=bearer_headers(access_token))
 
-print(response.status_code)
-try:
-    print(response.json())
-except ValueError:
-    print("No JSON returned. Response text:", response.text)
\ No newline at end of file
+
+def main() -> int:
+    response = create_nickname("<YOUR_NICKNAME_HERE>")
+
+    print(response.status_code)
+    try:
+        print(response.json())
+    except ValueError:
+        print("No JSON returned. Response text:", response.text)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
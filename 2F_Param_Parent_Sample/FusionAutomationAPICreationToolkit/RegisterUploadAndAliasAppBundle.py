@@ -1,24 +1,48 @@
 import os
-import json
 import argparse
+import socket
 import requests
-from typing import Any, Dict
+import urllib3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Dict
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
 
-from GenerateAccessToken import GenerateNewAccessToken
+from GenerateAccessToken import GenerateNewAccessToken, bearer_headers, json_loads, post_json, client as shared_client, session as shared_session
 
+try:
+    # optional: stream the multipart upload from disk instead of building it in memory
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
 
-def register_appbundle(bundle_id: str = '<YOUR_APPBUNDLE_NAME_HERE>', engine: str = 'Autodesk.Fusion+Latest', description: str = 'Appbundle to update parameters in Fusion 360 designs', access_token: str | None = None, raise_for_status: bool = True) -> dict:
+
+_DEFAULT_ZIP_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), 'AppBundles', '2F_Param_Edit.zip'))
+
+# Upload tuning: bigger socket send buffer and body chunks so large zips aren't pushed
+# to S3 in small writes. urllib3 < 2 has no blocksize pool option, so only the buffer applies there.
+_UPLOAD_SNDBUF = 4 * 1024 * 1024
+_UPLOAD_BLOCKSIZE = 1024 * 1024
+
+
+class _UploadAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_SNDBUF, _UPLOAD_SNDBUF)]
+        if int(urllib3.__version__.split('.')[0]) >= 2:
+            kwargs['blocksize'] = _UPLOAD_BLOCKSIZE
+        super().init_poolmanager(*args, **kwargs)
+
+
+_upload_adapter = _UploadAdapter()
+
+
+def register_appbundle(bundle_id: str = '<YOUR_APPBUNDLE_NAME_HERE>', engine: str = 'Autodesk.Fusion+Latest', description: str = 'Appbundle to update parameters in Fusion 360 designs', access_token: str | None = None, raise_for_status: bool = True, session=None) -> dict:
     """Register an appbundle and return the parsed JSON response.
 
     Returns the JSON response from the register call or a dict with raw_text on non-JSON responses.
     """
-    if access_token is None:
-        access_token = GenerateNewAccessToken()
-
-    headers = {
-        'Authorization': f'Bearer {access_token}',
-        'Content-Type': 'application/json'
-    }
+    headers = bearer_headers(access_token)
 
     payload = {
         'id': bundle_id,
@@ -26,20 +50,23 @@ def register_appbundle(bundle_id: str = '<YOUR_APPBUNDLE_NAME_HERE>', engine: st
         'description': description,
     }
 
-    resp = requests.post('https://developer.api.autodesk.com/da/us-east/v3/appbundles', json=payload, headers=headers)
+    # Registering by id is safe to resend if the server turned it away with 429/503
+    resp = post_json('https://developer.api.autodesk.com/da/us-east/v3/appbundles', payload, headers, http=session or shared_client, resend=True)
     if raise_for_status:
         resp.raise_for_status()
 
     try:
-        return resp.json()
+        return json_loads(resp.content)
     except ValueError:
         return {'raw_text': resp.text, 'status_code': resp.status_code}
 
 
-def upload_appbundle_from_uploadParameters(uploadParameters: dict, zip_path: str) -> requests.Response:
+def upload_appbundle_from_uploadParameters(uploadParameters: dict, zip_path: str, session: requests.Session | None = None, zip_file: BinaryIO | None = None) -> requests.Response:
     """Upload the zip to the endpoint described in uploadParameters.
 
     uploadParameters is expected to be a dict with keys 'endpointURL' and 'formData'.
+    If zip_file is an already-open handle for zip_path it is used (and closed) instead of reopening.
+    Without a session the shared one is used, with the upload host mounted on the tuned adapter.
     """
     endpoint = uploadParameters.get('endpointURL') or uploadParameters.get('endpoint')
     if not endpoint:
@@ -49,34 +76,47 @@ def upload_appbundle_from_uploadParameters(uploadParameters: dict, zip_path: str
     if not isinstance(formData, dict):
         raise ValueError('uploadParameters.formData missing or not a dict')
 
-    if not os.path.isfile(zip_path):
-        raise FileNotFoundError(f'Zip file not found: {zip_path}')
+    if zip_file is None:
+        zip_file = _open_zip(zip_path)
+
+    # Route just the upload host through the tuned adapter on our own session; a session
+    # passed in by the caller is used as configured
+    if session is None:
+        session = shared_session
+        parts = urlsplit(endpoint)
+        upload_prefix = f'{parts.scheme}://{parts.netloc}/'
+        if upload_prefix not in session.adapters:
+            session.mount(upload_prefix, _upload_adapter)
 
     headers = {'Cache-Control': 'no-cache'}
-    with open(zip_path, 'rb') as f:
-        files = {'file': (os.path.basename(zip_path), f, 'application/octet-stream')}
-        resp = requests.post(endpoint, data=formData, files=files, headers=headers)
+    with zip_file as f:
+        if MultipartEncoder is not None:
+            # S3 requires the file to be the last form field
+            fields = {k: (None, str(v)) for k, v in formData.items()}
+            fields['file'] = (os.path.basename(zip_path), f, 'application/octet-stream')
+            m = MultipartEncoder(fields=fields)
+            resp = session.post(endpoint, data=m, headers={**headers, 'Content-Type': m.content_type})
+        else:
+            files = {'file': (os.path.basename(zip_path), f, 'application/octet-stream')}
+            resp = session.post(endpoint, data=formData, files=files, headers=headers)
 
     return resp
 
 
-def _default_zip_path() -> str:
-    default = os.path.join(os.path.dirname(__file__), 'AppBundles', '2F_Param_Edit.zip')
-    return os.path.normpath(default)
+def _open_zip(zip_path: str) -> BinaryIO:
+    # open() is the existence check; other OSErrors (e.g. permissions) propagate as-is
+    try:
+        return open(zip_path, 'rb')
+    except FileNotFoundError:
+        raise FileNotFoundError(f'Zip file not found: {zip_path}') from None
 
 
-def create_alias(bundle_id, alias_id='my_current_version', version='1', access_token=None):
+def create_alias(bundle_id, alias_id='my_current_version', version='1', access_token=None, session=None):
     """Create an alias for the given appbundle.
 
-    Returns the requests.Response object.
+    Returns the response object.
     """
-    if access_token is None:
-        access_token = GenerateNewAccessToken()
-
-    headers = {
-        'Authorization': f'Bearer {access_token}',
-        'Content-Type': 'application/json'
-    }
+    headers = bearer_headers(access_token)
 
     payload = {
         'id': alias_id,
@@ -84,37 +124,62 @@ def create_alias(bundle_id, alias_id='my_current_version', version='1', access_t
     }
 
     url = f'https://developer.api.autodesk.com/da/us-east/v3/appbundles/{bundle_id}/aliases'
-    resp = requests.post(url, json=payload, headers=headers)
+    resp = post_json(url, payload, headers, http=session or shared_client, resend=True)
     return resp
 
 
-def register_upload_and_alias(zip_path, bundle_id='<YOUR_APPBUNDLE_NAME_HERE>', alias_id='my_current_version', alias_version='1', access_token=None, no_upload=False):
+def register_upload_and_alias(zip_path, bundle_id='<YOUR_APPBUNDLE_NAME_HERE>', alias_id='my_current_version', alias_version='1', access_token=None, no_upload=False, session=None):
     """Register, upload, and create alias for an appbundle.
 
     Returns a dict with keys: register, upload_response (or None), alias_response.
+    By default register and alias share the toolkit's HTTP/2 client with the token fetch, and
+    the S3 upload (which doesn't speak HTTP/2) uses the shared requests session. Pass session
+    to send all three through one requests session instead.
     """
+    # Resolve the token once here; otherwise register and alias would each fetch their own
+    access_token = access_token or GenerateNewAccessToken()
     result: Dict[str, Any] = {
         'register': None,
         'upload_response': None,
         'alias_response': None,
     }
 
-    # Register
-    reg = register_appbundle(bundle_id=bundle_id, access_token=access_token)
-    result['register'] = reg
-
-    uploadParameters = reg.get('uploadParameters')
-    if not uploadParameters:
-        raise RuntimeError('register response does not contain uploadParameters: ' + json.dumps(reg))
-
-    # Upload unless explicitly skipped
-    upload_resp = None
-    if not no_upload:
-        upload_resp = upload_appbundle_from_uploadParameters(uploadParameters, zip_path)
-        result['upload_response'] = {'status_code': upload_resp.status_code, 'text': upload_resp.text}
+    # Register, opening the zip meanwhile rather than waiting on the round-trip first
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        reg_future = ex.submit(register_appbundle, bundle_id=bundle_id, access_token=access_token, session=session)
+        zip_future = ex.submit(_open_zip, zip_path) if not no_upload else None
+    # A register failure takes precedence over a missing zip; don't leak the zip if it did open
+    reg_error = reg_future.exception()
+    if reg_error is not None:
+        if zip_future is not None and zip_future.exception() is None:
+            zip_future.result().close()
+        raise reg_error
+    zip_file = zip_future.result() if zip_future is not None else None
+    try:
+        reg = reg_future.result()
+        result['register'] = reg
+
+        uploadParameters = reg.get('uploadParameters')
+        if not uploadParameters:
+            # Keep the message small; the full (formData-heavy) response is attached for callers
+            err = RuntimeError(f'register response does not contain uploadParameters; keys={list(reg)[:10]}')
+            err.register_response = reg
+            raise err
+
+        # Upload unless explicitly skipped
+        upload_resp = None
+        if not no_upload:
+            upload_resp = upload_appbundle_from_uploadParameters(uploadParameters, zip_path, session=session, zip_file=zip_file)
+            # S3 answers a successful POST with an empty 204; only keep the (XML) body on errors
+            result['upload_response'] = {'status_code': upload_resp.status_code, 'text': upload_resp.text if upload_resp.status_code >= 400 else ''}
+            upload_resp.close()
+    finally:
+        # upload closes it on success; this covers the error paths
+        if zip_file is not None:
+            zip_file.close()
 
     # Create alias
-    alias_resp = create_alias(bundle_id=bundle_id, alias_id=alias_id, version=alias_version, access_token=access_token)
+    alias_resp = create_alias(bundle_id=bundle_id, alias_id=alias_id, version=alias_version, access_token=access_token, session=session)
     result['alias_response'] = {'status_code': alias_resp.status_code, 'text': alias_resp.text}
 
     return result
@@ -122,11 +187,12 @@ def register_upload_and_alias(zip_path, bundle_id='<YOUR_APPBUNDLE_NAME_HERE>',
 
 def main():
     parser = argparse.ArgumentParser(description='Register, upload, and create alias for an Autodesk appbundle')
-    parser.add_argument('--zip', '-z', dest='zip_path', default=_default_zip_path(), help='Path to the appbundle zip to upload')
+    parser.add_argument('--zip', '-z', dest='zip_path', default=_DEFAULT_ZIP_PATH, help='Path to the appbundle zip to upload')
     parser.add_argument('--id', dest='bundle_id', default='<YOUR_APPBUNDLE_NAME_HERE>', help='AppBundle id to register')
     parser.add_argument('--alias-id', dest='alias_id', default='my_current_version', help='Alias id to create')
     parser.add_argument('--alias-version', dest='alias_version', default='1', help='Alias version to point to')
     parser.add_argument('--no-upload', dest='no_upload', action='store_true', help='Skip upload step (register + alias only)')
+    parser.add_argument('--access-token', dest='access_token', default=None, help='Existing access token to use (a new one is generated if omitted)')
 
     args = parser.parse_args()
 
@@ -141,17 +207,18 @@ def main():
     print('Alias:', alias_id, '-> version', alias_version)
 
     try:
-        res = register_upload_and_alias(zip_path=zip_path, bundle_id=bundle_id, alias_id=alias_id, alias_version=alias_version, no_upload=args.no_upload)
-    except requests.HTTPError as e:
-        print('HTTP error during flow:', e)
-        if hasattr(e, 'response') and e.response is not None:
-            try:
-                print('Response JSON:', e.response.json())
-            except Exception:
-                print('Response text:', e.response.text)
-        return 1
+        res = register_upload_and_alias(zip_path=zip_path, bundle_id=bundle_id, alias_id=alias_id, alias_version=alias_version, access_token=args.access_token, no_upload=args.no_upload)
     except Exception as e:
-        print('Error during flow:', e)
+        # requests.HTTPError and httpx.HTTPStatusError both carry the failed response
+        response = getattr(e, 'response', None)
+        if response is None:
+            print('Error during flow:', e)
+            return 1
+        print('HTTP error during flow:', e)
+        try:
+            print('Response JSON:', response.json())
+        except Exception:
+            print('Response text:', response.text)
         return 1
 
     print('\nResults summary:')
@@ -172,7 +239,7 @@ def main():
     if alias_val:
         print('Alias creation status code:', alias_val.get('status_code'))
         try:
-            print('Alias response text:', json.loads(alias_val.get('text') or ''))
+            print('Alias response text:', json_loads(alias_val.get('text') or ''))
         except Exception:
             print('Alias response text (raw):', alias_val.get('text'))
     else: